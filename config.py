@@ -1,93 +1,211 @@
 import os
 import logging
+import functools
+from dataclasses import dataclass
+from typing import Optional
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+
+@functools.lru_cache(maxsize=1)
+def _bootstrap_env():
+    """Loads environment variables from .env file at most once per process"""
+    load_dotenv()
+
+
+_bootstrap_env()
 
 logger = logging.getLogger(__name__)
 
-# ============================================================================
-# REQUIRED ENVIRONMENT VARIABLES
-# ============================================================================
+# Snapshot of the environment taken once at import time
+_env = os.environ.copy()
 
-# Telegram Bot token from BotFather
-TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 
-# Freelancehunt API token
-FREELANCEHUNT_TOKEN = os.getenv("FREELANCEHUNT_TOKEN")
+def _get(key, default=None):
+    """Reads a value from the environment snapshot"""
+    return _env.get(key, default)
 
-# ============================================================================
-# MONGODB SETTINGS
-# ============================================================================
 
-# MongoDB connection URI
-MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+@dataclass(frozen=True, slots=True)
+class Config:
+    """Application settings, coerced once and frozen"""
 
-# MongoDB database name
-MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "zfh_robot")
+    # ========================================================================
+    # REQUIRED ENVIRONMENT VARIABLES
+    # ========================================================================
 
-# ============================================================================
-# PROJECT MONITORING SETTINGS
-# ============================================================================
+    # Telegram Bot token from BotFather
+    TELEGRAM_BOT_TOKEN: Optional[str]
 
-# Default check interval in seconds (60 seconds = 1 minute)
-DEFAULT_CHECK_INTERVAL = int(os.getenv("DEFAULT_CHECK_INTERVAL", "60"))
+    # Freelancehunt API token
+    FREELANCEHUNT_TOKEN: Optional[str]
 
-# Maximum check interval (1 hour)
-MAX_CHECK_INTERVAL = int(os.getenv("MAX_CHECK_INTERVAL", "3600"))
+    # ========================================================================
+    # MONGODB SETTINGS
+    # ========================================================================
 
-# Minimum check interval (30 seconds)
-MIN_CHECK_INTERVAL = int(os.getenv("MIN_CHECK_INTERVAL", "30"))
+    # MongoDB connection URI
+    MONGO_URI: str
 
-# ============================================================================
-# API RATE LIMITING SETTINGS
-# ============================================================================
+    # MongoDB database name
+    MONGO_DB_NAME: str
 
-# Minimum interval between API requests (seconds)
-MIN_API_REQUEST_INTERVAL = float(os.getenv("MIN_API_REQUEST_INTERVAL", "1.0"))
+    # Connection pool bounds
+    MONGO_MAX_POOL_SIZE: int
+    MONGO_MIN_POOL_SIZE: int
 
-# Conservative rate limit threshold (when to start being more careful)
-RATE_LIMIT_WARNING_THRESHOLD = int(os.getenv("RATE_LIMIT_WARNING_THRESHOLD", "20"))
+    # How long to wait for a free pooled connection / a reachable server (ms)
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int
 
-# Critical rate limit threshold (when to significantly slow down)
-RATE_LIMIT_CRITICAL_THRESHOLD = int(os.getenv("RATE_LIMIT_CRITICAL_THRESHOLD", "10"))
+    # How long a pooled connection may stay idle before it is closed (ms)
+    MONGO_MAX_IDLE_TIME_MS: int
 
-# ============================================================================
-# ENVIRONMENT SETTINGS
-# ============================================================================
+    # Wire protocol compressors in order of preference, empty to disable
+    MONGO_COMPRESSORS: str
+
+    # How long sent project records are kept before MongoDB expires them (days)
+    SENT_PROJECTS_TTL_DAYS: int
+
+    # ========================================================================
+    # PROJECT MONITORING SETTINGS
+    # ========================================================================
+
+    # Default check interval in seconds (60 seconds = 1 minute)
+    DEFAULT_CHECK_INTERVAL: int
+
+    # Maximum check interval (1 hour)
+    MAX_CHECK_INTERVAL: int
+
+    # Minimum check interval (30 seconds)
+    MIN_CHECK_INTERVAL: int
+
+    # How many (project, user) pairs are marked as sent and queued at the same time
+    MAX_CONCURRENT_SENT_MARKS: int
 
-# Logging level
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    # ========================================================================
+    # API RATE LIMITING SETTINGS
+    # ========================================================================
+
+    # Minimum interval between API requests (seconds)
+    MIN_API_REQUEST_INTERVAL: float
+
+    # Conservative rate limit threshold (when to start being more careful)
+    RATE_LIMIT_WARNING_THRESHOLD: int
+
+    # Critical rate limit threshold (when to significantly slow down)
+    RATE_LIMIT_CRITICAL_THRESHOLD: int
+
+    # How long a successful Freelancehunt API probe stays valid (seconds)
+    FREELANCEHUNT_HEALTHCHECK_TTL: int
+
+    # ========================================================================
+    # TELEGRAM SENDING SETTINGS
+    # ========================================================================
+
+    # Maximum outgoing messages per second across all chats
+    TELEGRAM_GLOBAL_RATE_LIMIT: int
+
+    # Minimum interval between two messages to the same chat (seconds)
+    TELEGRAM_PER_CHAT_INTERVAL: float
+
+    # ========================================================================
+    # ENVIRONMENT SETTINGS
+    # ========================================================================
+
+    # Logging level, resolved to its numeric value
+    LOG_LEVEL: Optional[int]
+
+
+def _load_config():
+    """Builds the settings object from the environment snapshot"""
+    return Config(
+        TELEGRAM_BOT_TOKEN=_get("TELEGRAM_BOT_TOKEN"),
+        FREELANCEHUNT_TOKEN=_get("FREELANCEHUNT_TOKEN"),
+        MONGO_URI=_get("MONGO_URI", "mongodb://localhost:27017"),
+        MONGO_DB_NAME=_get("MONGO_DB_NAME", "zfh_robot"),
+        MONGO_MAX_POOL_SIZE=int(_get("MONGO_MAX_POOL_SIZE", "50")),
+        MONGO_MIN_POOL_SIZE=int(_get("MONGO_MIN_POOL_SIZE", "5")),
+        MONGO_WAIT_QUEUE_TIMEOUT_MS=int(_get("MONGO_WAIT_QUEUE_TIMEOUT_MS", "2000")),
+        MONGO_SERVER_SELECTION_TIMEOUT_MS=int(_get("MONGO_SERVER_SELECTION_TIMEOUT_MS", "3000")),
+        MONGO_MAX_IDLE_TIME_MS=int(_get("MONGO_MAX_IDLE_TIME_MS", "300000")),
+        MONGO_COMPRESSORS=_get("MONGO_COMPRESSORS", "zstd,zlib"),
+        SENT_PROJECTS_TTL_DAYS=int(_get("SENT_PROJECTS_TTL_DAYS", "30")),
+        DEFAULT_CHECK_INTERVAL=int(_get("DEFAULT_CHECK_INTERVAL", "60")),
+        MAX_CHECK_INTERVAL=int(_get("MAX_CHECK_INTERVAL", "3600")),
+        MIN_CHECK_INTERVAL=int(_get("MIN_CHECK_INTERVAL", "30")),
+        MAX_CONCURRENT_SENT_MARKS=int(_get("MAX_CONCURRENT_SENT_MARKS", "64")),
+        MIN_API_REQUEST_INTERVAL=float(_get("MIN_API_REQUEST_INTERVAL", "1.0")),
+        RATE_LIMIT_WARNING_THRESHOLD=int(_get("RATE_LIMIT_WARNING_THRESHOLD", "20")),
+        RATE_LIMIT_CRITICAL_THRESHOLD=int(_get("RATE_LIMIT_CRITICAL_THRESHOLD", "10")),
+        FREELANCEHUNT_HEALTHCHECK_TTL=int(_get("FREELANCEHUNT_HEALTHCHECK_TTL", "300")),
+        TELEGRAM_GLOBAL_RATE_LIMIT=int(_get("TELEGRAM_GLOBAL_RATE_LIMIT", "30")),
+        TELEGRAM_PER_CHAT_INTERVAL=float(_get("TELEGRAM_PER_CHAT_INTERVAL", "1.0")),
+        LOG_LEVEL=logging.getLevelNamesMapping().get(_get("LOG_LEVEL", "INFO").upper()),
+    )
+
+
+# Global settings instance, taken from tools/freeze_config.py output if present.
+# A frozen file ignores environment changes until it is regenerated.
+try:
+    from config_frozen import CFG
+    CFG_FROZEN = True
+except ImportError:
+    CFG = _load_config()
+    CFG_FROZEN = False
+except (TypeError, ValueError, AttributeError, NameError, SyntaxError) as e:
+    # Stale file from an older Config, e.g. missing a newly added field
+    logger.warning("Ignoring outdated config_frozen.py (%s), regenerate it with tools/freeze_config.py", e)
+    CFG = _load_config()
+    CFG_FROZEN = False
 
 # ============================================================================
 # VALIDATION
 # ============================================================================
 
-def validate_config():
-    """Validates configuration settings"""
+@functools.lru_cache(maxsize=1)
+def _validate_once(cfg):
+    """Validates configuration settings, memoized after the first success"""
     errors = []
     
     # Check required environment variables
-    if not TELEGRAM_BOT_TOKEN:
+    if not cfg.TELEGRAM_BOT_TOKEN:
         errors.append("TELEGRAM_BOT_TOKEN is required")
     
-    if not FREELANCEHUNT_TOKEN:
+    if not cfg.FREELANCEHUNT_TOKEN:
         errors.append("FREELANCEHUNT_TOKEN is required")
     
     # Validate intervals
-    if MIN_CHECK_INTERVAL >= MAX_CHECK_INTERVAL:
+    if cfg.MIN_CHECK_INTERVAL >= cfg.MAX_CHECK_INTERVAL:
         errors.append("MIN_CHECK_INTERVAL must be less than MAX_CHECK_INTERVAL")
     
-    if DEFAULT_CHECK_INTERVAL < MIN_CHECK_INTERVAL or DEFAULT_CHECK_INTERVAL > MAX_CHECK_INTERVAL:
+    if cfg.DEFAULT_CHECK_INTERVAL < cfg.MIN_CHECK_INTERVAL or cfg.DEFAULT_CHECK_INTERVAL > cfg.MAX_CHECK_INTERVAL:
         errors.append("DEFAULT_CHECK_INTERVAL must be between MIN_CHECK_INTERVAL and MAX_CHECK_INTERVAL")
     
+    if cfg.MAX_CONCURRENT_SENT_MARKS <= 0:
+        errors.append("MAX_CONCURRENT_SENT_MARKS must be positive")
+    
+    # Validate MongoDB pool
+    if cfg.MONGO_MIN_POOL_SIZE > cfg.MONGO_MAX_POOL_SIZE:
+        errors.append("MONGO_MIN_POOL_SIZE must not exceed MONGO_MAX_POOL_SIZE")
+    
     # Validate rate limiting
-    if RATE_LIMIT_CRITICAL_THRESHOLD >= RATE_LIMIT_WARNING_THRESHOLD:
+    if cfg.RATE_LIMIT_CRITICAL_THRESHOLD >= cfg.RATE_LIMIT_WARNING_THRESHOLD:
         errors.append("RATE_LIMIT_CRITICAL_THRESHOLD must be less than RATE_LIMIT_WARNING_THRESHOLD")
     
+    # Validate Telegram sending
+    if cfg.TELEGRAM_GLOBAL_RATE_LIMIT <= 0:
+        errors.append("TELEGRAM_GLOBAL_RATE_LIMIT must be positive")
+    
+    # Validate logging
+    if cfg.LOG_LEVEL is None:
+        errors.append("LOG_LEVEL must be a valid logging level name")
+    
     if errors:
         raise ValueError("Configuration errors:\n" + "\n".join(f"- {error}" for error in errors))
 
+def validate_config(cfg=None):
+    """Validates configuration settings"""
+    _validate_once(cfg or CFG)
+
 # Validate configuration on import
-validate_config() 
\ No newline at end of file
+validate_config()
\ No newline at end of file
@@ -14,154 +14,207 @@ API обмежує кількість запитів. При перевищен
 """
 
 import asyncio
+import contextlib
+import datetime
 import logging
+import sys
+from typing import Optional
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
 from aiogram import Bot, Dispatcher
 from aiogram.enums.parse_mode import ParseMode
 from aiogram.client.default import DefaultBotProperties
 from aiogram.exceptions import TelegramAPIError
 
-import config
+from config import CFG, CFG_FROZEN
+from src.api.freelancehunt import api_client
 from src.handlers.commands import router
 from src.services.project_service import ProjectService
 from src.utils.db_manager import db_manager
+from src.utils.user_manager import user_manager
 
 # Configure logging
 logging.basicConfig(
-    level=logging.INFO,
+    level=CFG.LOG_LEVEL,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
 )
+# Skip collecting record fields the log format does not use
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
 logger = logging.getLogger(__name__)
 
-# Check required environment variables
-required_env_vars = {
-    'TELEGRAM_BOT_TOKEN': config.TELEGRAM_BOT_TOKEN,
-    'FREELANCEHUNT_TOKEN': config.FREELANCEHUNT_TOKEN,
-}
-
-for var_name, var_value in required_env_vars.items():
-    if not var_value:
-        logger.error(f"Missing required environment variable: {var_name}")
-        raise ValueError(f"Missing required environment variable: {var_name}")
-
 # Initialize bot and dispatcher
-bot = Bot(token=config.TELEGRAM_BOT_TOKEN, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+bot = Bot(token=CFG.TELEGRAM_BOT_TOKEN, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
 dp = Dispatcher()
 dp.include_router(router)
 
-# Initialize project service
-project_service_instance = ProjectService(bot)
+# Project service is created on first use in startup()
+_project_service: Optional[ProjectService] = None
+# Background Freelancehunt probe started by check_freelancehunt_api()
+_health_refresh_task: Optional[asyncio.Task] = None
 
-# Make project service available to handlers
-import src.services.project_service
-src.services.project_service.project_service = project_service_instance
+# How long shutdown waits for the monitoring loop before cancelling it (seconds)
+MONITORING_STOP_TIMEOUT = 10
 
 # Log startup settings
 logger.info("Starting Freelancehunt Bot")
-logger.info(f"MongoDB: {config.MONGO_DB_NAME} on {config.MONGO_URI}")
+logger.info("MongoDB: %s on %s", CFG.MONGO_DB_NAME, CFG.MONGO_URI)
+if CFG_FROZEN:
+    logger.info("Using frozen settings from config_frozen.py, environment changes are ignored")
+
+
+def get_project_service() -> ProjectService:
+    """Повертає сервіс моніторингу, створюючи його при першому зверненні"""
+    global _project_service
+    if _project_service is None:
+        _project_service = ProjectService(bot)
+    return _project_service
 
 
 async def check_telegram_token():
     """Перевіряє валідність токена бота"""
     try:
         bot_info = await bot.me()
-        logger.info(f"Bot authorized as @{bot_info.username} (ID: {bot_info.id})")
+        logger.info("Bot authorized as @%s (ID: %s)", bot_info.username, bot_info.id)
         return True
     except TelegramAPIError as e:
-        logger.error(f"Failed to authorize bot: {e}")
+        logger.error("Failed to authorize bot: %s", e)
         return False
 
 
-async def check_freelancehunt_api():
-    """Перевіряє доступність Freelancehunt API"""
+async def refresh_freelancehunt_health():
+    """Перевіряє Freelancehunt API та зберігає результат у БД, повертає результат перевірки"""
     try:
-        # Import here to avoid circular imports
-        from src.api.freelancehunt import FreelancehuntAPI
-        api = FreelancehuntAPI()
-        # Try to make a simple API call to check connectivity
-        await api.get_projects()
+        # Check connectivity without downloading the projects list
+        if not await api_client.ping():
+            logger.warning("Freelancehunt API probe failed")
+            return False
         logger.info("Successfully connected to Freelancehunt API")
-        return True
     except Exception as e:
-        logger.error(f"Failed to connect to Freelancehunt API: {e}")
+        logger.error("Failed to connect to Freelancehunt API: %s", e)
         return False
+    
+    try:
+        await db_manager.set_service_state("freelancehunt", {"last_healthy_at": datetime.datetime.now()})
+    except Exception as e:
+        logger.warning("Failed to save Freelancehunt API state: %s", e)
+    return True
+
+
+async def check_freelancehunt_api():
+    """Перевіряє доступність Freelancehunt API без блокування запуску"""
+    global _health_refresh_task
+    
+    last_healthy_at = None
+    try:
+        state = await db_manager.get_service_state("freelancehunt")
+        last_healthy_at = state.get("last_healthy_at") if state else None
+    except Exception as e:
+        logger.warning("Failed to read cached Freelancehunt API state: %s", e)
+    
+    # Nothing known about the API yet, probe before starting
+    if not last_healthy_at:
+        return await refresh_freelancehunt_health()
+    
+    age = (datetime.datetime.now() - last_healthy_at).total_seconds()
+    if age < CFG.FREELANCEHUNT_HEALTHCHECK_TTL:
+        logger.info("Freelancehunt API was healthy %.0fs ago, skipping probe", age)
+        return True
+    
+    # Serve the last known state and refresh it in background
+    _health_refresh_task = asyncio.create_task(refresh_freelancehunt_health())
+    return True
 
 
 async def check_mongodb_connection():
     """Перевіряє доступність MongoDB"""
     try:
-        # Connect to database
+        # Connect to database, connect() pings the server
         await db_manager.connect()
         
-        # Test connection with a simple command
-        if db_manager.db is not None:
-            await db_manager.db.command("ping")
-            
         logger.info("Successfully connected to MongoDB")
         return True
     except Exception as e:
-        logger.error(f"Failed to connect to MongoDB: {e}")
+        logger.error("Failed to connect to MongoDB: %s", e)
         return False
 
 
 async def startup():
     """Дії при запуску бота"""
     try:
-        # Check Telegram token
-        if not await check_telegram_token():
-            raise ValueError("Invalid Telegram token")
+        # Check Telegram token, MongoDB and Freelancehunt API concurrently
+        telegram_ok, mongodb_ok, freelancehunt_ok = await asyncio.gather(
+            check_telegram_token(),
+            check_mongodb_connection(),
+            check_freelancehunt_api(),
+        )
+        
+        errors = []
+        if not telegram_ok:
+            errors.append("Invalid Telegram token")
+        if not mongodb_ok:
+            errors.append("Failed to connect to MongoDB")
+        if not freelancehunt_ok:
+            errors.append("Failed to connect to Freelancehunt API")
+        if errors:
+            raise ValueError("; ".join(errors))
         
         # Remove webhook if exists (required for polling)
         try:
             await bot.delete_webhook(drop_pending_updates=True)
             logger.info("Webhook deleted successfully")
         except Exception as e:
-            logger.warning(f"Failed to delete webhook: {e}")
-        
-        # Check MongoDB connection
-        if not await check_mongodb_connection():
-            raise ValueError("Failed to connect to MongoDB")
-        
-        # Check Freelancehunt API connection
-        if not await check_freelancehunt_api():
-            raise ValueError("Failed to connect to Freelancehunt API")
+            logger.warning("Failed to delete webhook: %s", e)
         
         # Load data from database
-        from src.utils.user_manager import user_manager
         await user_manager.load_data_from_db()
         
-        # Start project monitoring
+        # Start project monitoring and make it available to handlers
+        project_service = get_project_service()
+        dp["project_service"] = project_service
         logger.info("Project monitoring service initialized")
         # Start monitoring in background
-        asyncio.create_task(project_service_instance.start_monitoring())
+        project_service.ensure_monitoring()
         
     except Exception as e:
-        logger.error(f"Startup failed: {e}")
+        logger.error("Startup failed: %s", e)
         raise
 
 
-async def shutdown():
-    """Дії при зупинці бота"""
-    try:
-        # Stop project monitoring
-        project_service_instance.stop_monitoring()
-        logger.info("Project monitoring stopped")
-        
-        # Close MongoDB connection
-        await db_manager.close()
-        logger.info("MongoDB connection closed")
-        
-        # Close bot session
-        await bot.session.close()
-        logger.info("Bot session closed")
-        
-    except Exception as e:
-        logger.error(f"Shutdown error: {e}")
+async def stop_monitoring():
+    """Зупиняє моніторинг проектів і чекає завершення циклу"""
+    # Wait for the monitoring loop to finish before closing its resources,
+    # the stop event ends it; cancel only if it does not finish in time
+    if _project_service is not None:
+        await _project_service.stop(MONITORING_STOP_TIMEOUT)
+    logger.info("Project monitoring stopped")
+
+
+async def cancel_health_refresh():
+    """Скасовує фонову перевірку Freelancehunt API, якщо вона ще триває"""
+    if _health_refresh_task is not None and not _health_refresh_task.done():
+        _health_refresh_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await _health_refresh_task
 
 
 async def main():
     """Запуск бота через polling."""
-    try:
+    async with contextlib.AsyncExitStack() as stack:
+        # Cleanup runs in reverse order and every step runs even if startup
+        # or a previous step failed
+        stack.callback(logger.info, "Bot resources released")
+        stack.push_async_callback(bot.session.close)
+        stack.push_async_callback(db_manager.close)
+        stack.push_async_callback(api_client.close)
+        stack.push_async_callback(cancel_health_refresh)
+        stack.push_async_callback(stop_monitoring)
+        
         logger.info("Starting Freelancehunt Telegram Bot")
         
         # Startup initialization
@@ -169,21 +222,19 @@ async def main():
         
         logger.info("Bot started in polling mode")
         
-        # Start polling
-        await dp.start_polling(bot)
-        
-    except Exception as e:
-        logger.error(f"Error during bot startup: {e}")
-        raise
-    finally:
-        await shutdown()
+        # Start polling, SIGINT/SIGTERM stop it and fall through to cleanup
+        await dp.start_polling(bot, handle_signals=True)
 
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        # Use uvloop where available, default asyncio loop otherwise
+        loop_factory = uvloop.new_event_loop if uvloop is not None else None
+        with asyncio.Runner(loop_factory=loop_factory) as runner:
+            runner.run(main())
     except (KeyboardInterrupt, SystemExit):
         logger.info("Bot stopped")
-    except Exception as e:
-        logger.error(f"Fatal error: {e}")
-        raise
\ No newline at end of file
+    except Exception:
+        logger.exception("Fatal error")
+        # Non-zero exit code lets the process supervisor restart the bot
+        sys.exit(1)
\ No newline at end of file
@@ -4,28 +4,115 @@ Freelancehunt API client.
 Handles all interactions with Freelancehunt API including projects and user profile.
 """
 
+import asyncio
 import json
 import logging
-from typing import Dict, List, Any
+import random
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Tuple
 
 import aiohttp
 
-import config
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from config import CFG
 from .rate_limiter import rate_limiter
 
 logger = logging.getLogger(__name__)
 
+# orjson decodes project lists noticeably faster than stdlib json when available
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# User filter keys mapped to Freelancehunt API query parameters
+_FILTER_MAP = {
+    # Временно отключен фильтр only_my_skills так как работает только с персональным ключом
+    # "only_my_skills": "filter[only_my_skills]",
+    "skill_id": "filter[skill_id]",
+    "employer_id": "filter[employer_id]",
+    "only_for_plus": "filter[only_for_plus]",
+}
+
+# Filter names users may set, anything else is rejected before it reaches the database
+FILTER_KEYS = frozenset(_FILTER_MAP)
+
 
 class FreelancehuntAPI:
     """Client for Freelancehunt API."""
     
     BASE_URL = "https://api.freelancehunt.com/v2"
     
+    # Default request headers, built once and bound to the shared session
+    HEADERS = MappingProxyType({
+        "Authorization": f"Bearer {CFG.FREELANCEHUNT_TOKEN}",
+        "Content-Type": "application/json",
+    })
+    
+    # Retry settings for transient network errors and HTTP 429
+    MAX_ATTEMPTS = 4
+    RETRY_BASE_DELAY = 0.5
+    RETRY_MAX_DELAY = 8.0
+    MAX_RETRY_AFTER = 60
+    
+    # Upper bound on simultaneous requests to the API
+    MAX_CONCURRENT_REQUESTS = 8
+    
+    # How long a projects response is reused for identical filter sets (seconds)
+    PROJECTS_CACHE_TTL = 10
+    
+    # Upper bound on remembered ETag / Last-Modified responses (least recently used are dropped)
+    CONDITIONAL_CACHE_MAX_ENTRIES = 256
+    
     def __init__(self):
-        self.headers = {
-            "Authorization": f"Bearer {config.FREELANCEHUNT_TOKEN}",
-            "Content-Type": "application/json",
-        }
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Created on first request so it binds to the running event loop
+        self._concurrency: Optional[asyncio.Semaphore] = None
+        # Last ETag / Last-Modified validators and response data per request
+        self._conditional_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        # In-flight and recently finished get_projects calls keyed by query params
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        self._projects_cache: Dict[tuple, Tuple[float, List[Dict[str, Any]]]] = {}
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=20,
+                limit_per_host=10,
+                keepalive_timeout=75,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.HEADERS,
+                timeout=aiohttp.ClientTimeout(total=15),
+            )
+        return self._session
+    
+    async def close(self) -> None:
+        """Close the shared HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    @classmethod
+    def _backoff_delay(cls, attempt: int) -> float:
+        """Exponential backoff with jitter for the given attempt number."""
+        delay = cls.RETRY_BASE_DELAY * 2 ** (attempt - 1) + random.uniform(0, cls.RETRY_BASE_DELAY)
+        return min(delay, cls.RETRY_MAX_DELAY)
+    
+    @classmethod
+    def _parse_retry_after(cls, value: Optional[str]) -> Optional[float]:
+        """Parse Retry-After header, None if missing or too long to wait for."""
+        if not value or not value.isdigit():
+            return None
+        retry_after = float(value)
+        if retry_after > cls.MAX_RETRY_AFTER:
+            return None
+        return retry_after
     
     async def _make_request(self, endpoint: str, params: Dict[str, str] = None) -> Dict[str, Any]:
         """
@@ -39,41 +126,50 @@ class FreelancehuntAPI:
         """
         # Check rate limits before making request
         if rate_limiter.should_skip_request():
-            logger.warning(f"Skipping request to {endpoint} due to rate limit")
+            logger.warning("Skipping request to %s due to rate limit", endpoint)
             return {}
         
         # Wait if needed to respect rate limits
         await rate_limiter.wait_if_needed()
         
+        # Other requests may have used up the limit while we were waiting
+        if rate_limiter.should_skip_request():
+            logger.warning("Skipping request to %s due to rate limit", endpoint)
+            return {}
+        
         url = f"{self.BASE_URL}{endpoint}"
-        if params:
-            query_string = "&".join([f"{k}={v}" for k, v in params.items()])
-            url += f"?{query_string}"
+        cache_key = (endpoint, tuple(sorted((params or {}).items())))
+        
+        logger.info("Making API request to: %s with params %s", url, params)
+        
+        # Send conditional request if we already have a cached response
+        request_headers = {}
+        cached = self._conditional_cache.get(cache_key)
+        if cached:
+            self._conditional_cache.move_to_end(cache_key)
+            if cached["etag"]:
+                request_headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                request_headers["If-Modified-Since"] = cached["last_modified"]
         
-        logger.info(f"Making API request to: {url}")
+        session = await self._get_session()
+        if self._concurrency is None:
+            self._concurrency = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
         
-        async with aiohttp.ClientSession() as session:
+        for attempt in range(1, self.MAX_ATTEMPTS + 1):
+            retry_delay = None
+            rate_limited = False
             try:
-                async with session.get(url, headers=self.headers) as response:
+                async with self._concurrency, session.get(url, headers=request_headers, params=params) as response:
                     # Update rate limit info from response headers
-                    headers_dict = dict(response.headers)
-                    
-                    # Check for rate limit headers only, without logging all headers
-                    ratelimit_headers = {}
-                    for header_name, header_value in headers_dict.items():
-                        header_lower = header_name.lower()
-                        if 'ratelimit' in header_lower:
-                            ratelimit_headers[header_name] = header_value
-                    
-                    # Only log if we found relevant headers
-                    if ratelimit_headers:
-                        logger.debug(f"Rate limit headers found: {ratelimit_headers}")
-                    
-                    rate_limiter.update_from_headers(headers_dict)
+                    rate_limiter.update_from_headers(response.headers)
                     
                     if response.status == 200:
                         # Get the response data
-                        response_data = await response.json()
+                        response_data = await response.json(loads=_json_loads, content_type=None)
+                        if not isinstance(response_data, dict):
+                            logger.error("Unexpected response body from %s: %r", url, type(response_data).__name__)
+                            return {}
                         
                         # Check if rate limit info is in the response body
                         # Some APIs include rate limit in a "meta" field
@@ -81,37 +177,95 @@ class FreelancehuntAPI:
                             meta = response_data.get("meta", {})
                             if "ratelimit" in meta or "rate_limit" in meta:
                                 rate_limit_info = meta.get("ratelimit", {}) or meta.get("rate_limit", {})
-                                logger.debug(f"Rate limit info from body: {rate_limit_info}")
+                                logger.debug("Rate limit info from body: %s", rate_limit_info)
                                 
                                 # Update rate limiter from body data
                                 if "limit" in rate_limit_info and "remaining" in rate_limit_info:
                                     try:
                                         limit_value = int(rate_limit_info["limit"])
                                         remaining_value = int(rate_limit_info["remaining"])
-                                        rate_limiter.limit = limit_value
-                                        rate_limiter.remaining = remaining_value
-                                        logger.debug(f"Updated rate limits from body: {remaining_value}/{limit_value}")
+                                        rate_limiter.set_limits(limit_value, remaining_value)
+                                        logger.debug("Updated rate limits from body: %s/%s", remaining_value, limit_value)
                                     except (ValueError, TypeError) as e:
-                                        logger.warning(f"Failed to parse rate limit from body: {e}")
+                                        logger.warning("Failed to parse rate limit from body: %s", e)
                         
                         # If we still don't have rate limit info, set default values
                         if rate_limiter.limit is None:
-                            rate_limiter.limit = 30  # Default per minute based on common API practices
-                            rate_limiter.remaining = 29  # Conservative default
+                            # Default per minute based on common API practices, conservative remaining
+                            rate_limiter.set_limits(30, 29)
                             logger.debug("Using default rate limit values (30 requests/minute)")
                         
+                        # Remember validators for the next conditional request
+                        etag = response.headers.get("ETag")
+                        last_modified = response.headers.get("Last-Modified")
+                        if etag or last_modified:
+                            self._conditional_cache[cache_key] = {
+                                "etag": etag,
+                                "last_modified": last_modified,
+                                "data": response_data,
+                            }
+                            self._conditional_cache.move_to_end(cache_key)
+                            while len(self._conditional_cache) > self.CONDITIONAL_CACHE_MAX_ENTRIES:
+                                self._conditional_cache.popitem(last=False)
+                        
                         return response_data
+                    elif response.status == 304 and cached:
+                        logger.debug("Not modified, using cached response for %s", url)
+                        return cached["data"]
                     elif response.status == 429:
                         logger.error("Rate limit exceeded (HTTP 429)")
                         rate_limiter.remaining = 0
-                        return {}
+                        retry_delay = self._parse_retry_after(response.headers.get("Retry-After"))
+                        if retry_delay is None:
+                            return {}
+                        rate_limited = True
                     else:
                         error_text = await response.text()
-                        logger.error(f"API error {response.status}: {error_text}")
+                        logger.error("API error %s: %s", response.status, error_text)
                         return {}
-            except aiohttp.ClientError as e:
-                logger.error(f"Request error: {e}")
-                return {}
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                # ValueError covers a malformed JSON body
+                logger.error("Request error: %s", e)
+                retry_delay = self._backoff_delay(attempt)
+            
+            if attempt == self.MAX_ATTEMPTS:
+                break
+            
+            logger.warning("Retrying request to %s in %.1fs (attempt %s/%s)", endpoint, retry_delay, attempt + 1, self.MAX_ATTEMPTS)
+            await asyncio.sleep(retry_delay)
+            
+            if rate_limited:
+                # Waiting out Retry-After resets the server-side window
+                rate_limiter.remaining = None
+            elif rate_limiter.should_skip_request():
+                break
+            
+            await rate_limiter.wait_if_needed()
+        
+        return {}
+    
+    async def ping(self) -> bool:
+        """
+        Check that the API is reachable and the token is accepted.
+        
+        Only the status code is inspected, the projects payload is never read or decoded.
+        """
+        if rate_limiter.should_skip_request():
+            return False
+        
+        await rate_limiter.wait_if_needed()
+        
+        session = await self._get_session()
+        try:
+            async with session.get(f"{self.BASE_URL}/projects") as response:
+                rate_limiter.update_from_headers(response.headers)
+                response.release()
+                if response.status != 200:
+                    logger.error("API ping failed with status %s", response.status)
+                return response.status == 200
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error("API ping error: %s", e)
+            return False
     
     async def get_projects(self, filters: Dict[str, str] = None) -> List[Dict[str, Any]]:
         """
@@ -120,31 +274,49 @@ class FreelancehuntAPI:
         API Documentation: https://apidocs.freelancehunt.com/#0eed992e-18f1-4dc4-892d-22b9d896935b
         Endpoint: GET /v2/projects
         """
-        params = {}
-        
         # Build filter parameters
         # ВАЖНО: При добавлении новых фильтров проверьте документацию API:
         # https://apidocs.freelancehunt.com/#0eed992e-18f1-4dc4-892d-22b9d896935b
+        params = {}
         if filters:
-            for key, value in filters.items():
-                # Временно отключен фильтр only_my_skills так как работает только с персональным ключом
-                # if key == "only_my_skills" and value == "1":
-                #     params["filter[only_my_skills]"] = "1"
-                if key == "skill_id" and value:
-                    params["filter[skill_id]"] = value
-                elif key == "employer_id" and value:
-                    params["filter[employer_id]"] = value
-                elif key == "only_for_plus" and value == "1":
-                    params["filter[only_for_plus]"] = "1"
-        
-        logger.info(f"Fetching projects with filters: {filters}")
-        logger.info(f"API request params: {params}")
+            params = {
+                _FILTER_MAP[key]: value
+                for key, value in filters.items()
+                if key in _FILTER_MAP and value and (key != "only_for_plus" or value == "1")
+            }
         
+        logger.debug("Fetching projects with filters: %s", filters)
+        
+        # Users with identical filters share one request per poll tick
+        key = tuple(sorted(params.items()))
+        loop = asyncio.get_running_loop()
+        cached = self._projects_cache.get(key)
+        if cached and loop.time() - cached[0] < self.PROJECTS_CACHE_TTL:
+            return cached[1]
+        
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._fetch_projects(key, params))
+            self._inflight[key] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(key, None))
+        
+        return await asyncio.shield(inflight)
+    
+    async def _fetch_projects(self, key: tuple, params: Dict[str, str]) -> List[Dict[str, Any]]:
+        """Fetch projects and remember successful responses for PROJECTS_CACHE_TTL."""
         data = await self._make_request("/projects", params)
         projects = data.get("data", [])
         
         # logger.info(f"Received {len(projects)} projects from API")
         
+        if "data" in data:
+            now = asyncio.get_running_loop().time()
+            # Drop expired entries so filter sets of departed users do not pile up
+            expired = [k for k, (stored_at, _) in self._projects_cache.items() if now - stored_at >= self.PROJECTS_CACHE_TTL]
+            for k in expired:
+                del self._projects_cache[k]
+            self._projects_cache[key] = (now, projects)
+        
         return projects
     
     # Временно отключен метод get_user_profile так как требует персональный API ключ
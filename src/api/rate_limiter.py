@@ -4,12 +4,15 @@ Rate limiting manager for Freelancehunt API.
 Manages API rate limits to prevent HTTP 429 errors.
 """
 
+from __future__ import annotations
+
 import asyncio
 import logging
-from datetime import datetime
-from typing import Dict, Optional
+from collections.abc import Mapping
+
+from multidict import CIMultiDict, CIMultiDictProxy
 
-import config
+from config import CFG
 
 logger = logging.getLogger(__name__)
 
@@ -27,67 +30,68 @@ class RateLimitManager:
     """
     
     def __init__(self):
-        self.limit: Optional[int] = None
-        self.remaining: Optional[int] = None
-        self.last_request_time: Optional[datetime] = None
-        self.min_interval_between_requests = config.MIN_API_REQUEST_INTERVAL
+        self.limit: int | None = None
+        self.remaining: int | None = None
+        # Earliest event loop time the next request may start
+        self._next_allowed_time = 0.0
+        self.min_interval_between_requests = CFG.MIN_API_REQUEST_INTERVAL
+        self._warn_threshold = CFG.RATE_LIMIT_WARNING_THRESHOLD
+        self._crit_threshold = CFG.RATE_LIMIT_CRITICAL_THRESHOLD
+        # Backoff steps ordered from the most severe threshold, first match wins
+        self._backoff_steps = (
+            (self._crit_threshold, 10.0, "Very low"),
+            (self._warn_threshold, 5.0, "Low"),
+        )
+        
+    def set_limits(self, limit: int | None, remaining: int | None) -> None:
+        """
+        Replace limit and remaining together.
         
-    def update_from_headers(self, headers: Dict[str, str]) -> None:
+        Values are parsed into locals by callers and stored here in one step,
+        so no task can observe a new limit paired with a stale remaining.
+        """
+        self.limit, self.remaining = limit, remaining
+    
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
         """
         Update rate limit info from API response headers.
         
-        Tries to find rate limit headers in different formats and casings:
+        Accepts aiohttp's response.headers (CIMultiDictProxy) as is, no copy needed.
+        
+        Looks up rate limit headers in both formats:
         - X-Ratelimit-Limit / X-Ratelimit-Remaining
         - X-Rate-Limit-Limit / X-Rate-Limit-Remaining
-        or other variations that might contain 'ratelimit' in the header name.
+        Direct lookups come first, a lowercased copy is only built for plain
+        dicts when they miss.
         """
         try:
-            # Check for various header casings and formats
-            limit_found = False
-            remaining_found = False
+            # Probe the casings servers actually send first
+            limit_value = headers.get("X-Ratelimit-Limit") or headers.get("X-Rate-Limit-Limit")
+            remaining_value = headers.get("X-Ratelimit-Remaining") or headers.get("X-Rate-Limit-Remaining")
             
-            # Check all headers for rate limit information
-            for header, value in headers.items():
-                header_lower = header.lower()
-                
-                # Try to find limit header
-                if 'x-ratelimit-limit' in header_lower:
-                    try:
-                        self.limit = int(value)
-                        limit_found = True
-                    except (ValueError, TypeError):
-                        pass
-                    
-                # Try to find remaining header
-                if 'x-ratelimit-remaining' in header_lower:
-                    try:
-                        self.remaining = int(value)
-                        remaining_found = True
-                    except (ValueError, TypeError):
-                        pass
-                    
-                # Some APIs use different header formats
-                if 'x-rate-limit-limit' in header_lower and not limit_found:
-                    try:
-                        self.limit = int(value)
-                        limit_found = True
-                    except (ValueError, TypeError):
-                        pass
-                    
-                if 'x-rate-limit-remaining' in header_lower and not remaining_found:
-                    try:
-                        self.remaining = int(value)
-                        remaining_found = True
-                    except (ValueError, TypeError):
-                        pass
+            # aiohttp headers are case-insensitive already, so a miss there is final.
+            # Plain dicts fall back to a lowercased copy when both lookups miss.
+            if (limit_value is None and remaining_value is None
+                    and not isinstance(headers, (CIMultiDict, CIMultiDictProxy))):
+                lowered = {header.lower(): value for header, value in headers.items()}
+                limit_value = lowered.get("x-ratelimit-limit") or lowered.get("x-rate-limit-limit")
+                remaining_value = lowered.get("x-ratelimit-remaining") or lowered.get("x-rate-limit-remaining")
+            
+            limit_found = limit_value is not None and limit_value.isdecimal()
+            remaining_found = remaining_value is not None and remaining_value.isdecimal()
+            
+            self.set_limits(
+                int(limit_value) if limit_found else self.limit,
+                int(remaining_value) if remaining_found else self.remaining,
+            )
             
             if limit_found or remaining_found:
-                logger.info(f"Rate limit updated: {self.remaining}/{self.limit} remaining")
+                logger.info("Rate limit updated: %s/%s remaining", self.remaining, self.limit)
             else:
                 logger.warning("No rate limit headers found in response")
                 
         except Exception as e:
-            logger.warning(f"Failed to parse rate limit headers: {e}")
+            logger.warning("Failed to parse rate limit headers: %s", e)
     
     async def wait_if_needed(self) -> None:
         """
@@ -98,27 +102,33 @@ class RateLimitManager:
         2. If remaining requests are below warning threshold, wait longer
         3. If remaining requests are below critical threshold, wait even longer
         """
-        now = datetime.now()
+        loop = asyncio.get_running_loop()
+        now = loop.time()
         
-        # Always wait minimum interval between requests
-        if self.last_request_time:
-            time_since_last = (now - self.last_request_time).total_seconds()
-            if time_since_last < self.min_interval_between_requests:
-                wait_time = self.min_interval_between_requests - time_since_last
-                logger.info(f"Waiting {wait_time:.1f}s to respect minimum interval")
-                await asyncio.sleep(wait_time)
+        # Fast path: no known limits and the next slot is already free
+        if self.remaining is None and now >= self._next_allowed_time:
+            self._next_allowed_time = now + self.min_interval_between_requests
+            return
         
-        # If we're running low on requests, wait longer
-        if self.remaining is not None and self.remaining < config.RATE_LIMIT_WARNING_THRESHOLD:
-            wait_time = 5.0  # Wait 5 seconds if below warning threshold
-            logger.warning(f"Low rate limit remaining ({self.remaining}), waiting {wait_time}s")
-            await asyncio.sleep(wait_time)
-        elif self.remaining is not None and self.remaining < config.RATE_LIMIT_CRITICAL_THRESHOLD:
-            wait_time = 10.0  # Wait 10 seconds if below critical threshold
-            logger.warning(f"Very low rate limit remaining ({self.remaining}), waiting {wait_time}s")
+        # Always wait minimum interval between requests.
+        # Reserve a slot before sleeping so concurrent callers are spaced out
+        # (t, t+interval, t+2*interval...) instead of all waking up together.
+        # There is no await between the read and the write, so no lock is needed.
+        slot = max(now, self._next_allowed_time)
+        self._next_allowed_time = slot + self.min_interval_between_requests
+        
+        wait_time = slot - now
+        if wait_time > 0:
+            logger.info("Waiting %.1fs to respect minimum interval", wait_time)
             await asyncio.sleep(wait_time)
         
-        self.last_request_time = datetime.now()
+        # If we're running low on requests, wait longer
+        if self.remaining is not None:
+            for threshold, wait_time, severity in self._backoff_steps:
+                if self.remaining < threshold:
+                    logger.warning("%s rate limit remaining (%s), waiting %ss", severity, self.remaining, wait_time)
+                    await asyncio.sleep(wait_time)
+                    break
     
     def should_skip_request(self) -> bool:
         """Check if we should skip the request due to rate limits."""
@@ -5,25 +5,72 @@ Main service that checks for new projects and sends notifications.
 """
 
 import asyncio
+import contextlib
 import logging
+from collections import defaultdict
+from typing import Dict, List, Optional
 
 from aiogram import Bot
+from aiogram.exceptions import TelegramNetworkError, TelegramRetryAfter, TelegramServerError
+
+from config import CFG
 
 from src.api.freelancehunt import api_client
 from src.api.rate_limiter import rate_limiter
 from src.utils.user_manager import user_manager
 from src.utils.message_formatter import message_formatter
 from src.utils.project_checker import project_checker
+from src.utils.send_limiter import send_limiter
 
 logger = logging.getLogger(__name__)
 
+# Send errors worth another attempt, anything else (blocked bot, bad markup) is final
+_TRANSIENT_SEND_ERRORS = (TelegramRetryAfter, TelegramNetworkError, TelegramServerError, asyncio.TimeoutError)
+
+# Sent projects of a user that has none yet
+_NOTHING_SENT = frozenset()
+
 
 class ProjectService:
     """Service for monitoring and notifying about new projects."""
     
+    # Notification delivery: queue bound, parallel senders and retries
+    SEND_QUEUE_SIZE = 1000
+    SENDER_WORKERS = 8
+    SEND_ATTEMPTS = 3
+    SEND_RETRY_BASE_DELAY = 0.5
+    
+    # Check interval feedback from Telegram flood control: grow on 429,
+    # decay after a run of clean ticks
+    FLOOD_INTERVAL_GROWTH = 1.5
+    FLOOD_INTERVAL_DECAY = 0.9
+    MAX_INTERVAL_MULTIPLIER = 4.0
+    CLEAN_TICKS_BEFORE_DECAY = 5
+    
     def __init__(self, bot: Bot):
         self.bot = bot
         self.is_running = False
+        self._task: Optional[asyncio.Task] = None
+        # Set by stop_monitoring(), wakes the loop from its interval wait
+        self._stop_event = asyncio.Event()
+        self._mark_semaphore = asyncio.Semaphore(CFG.MAX_CONCURRENT_SENT_MARKS)
+        # (user_id, project_id, message_text, keyboard) waiting to be delivered
+        self._send_queue: Optional[asyncio.Queue] = None
+        # Scales the smart interval, driven by flood control responses
+        self._interval_multiplier = 1.0
+        self._clean_streak = 0
+        self._flood_seen = False
+    
+    def ensure_monitoring(self) -> asyncio.Task:
+        """
+        Start the monitoring loop in background unless it is already running.
+        
+        The check and the task creation have no await in between, so concurrent
+        callers (e.g. many /start commands in one tick) spawn a single loop.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.start_monitoring())
+        return self._task
     
     async def start_monitoring(self) -> None:
         """Start the project monitoring loop."""
@@ -32,28 +79,68 @@ class ProjectService:
             return
         
         self.is_running = True
+        self._stop_event.clear()
         logger.info("Starting project monitoring service")
         
         # Ensure user data is loaded from database
         if not user_manager._loaded:
             await user_manager.load_data_from_db()
         
+        # Checks only queue notifications, sender workers deliver them,
+        # so a slow chat never delays the next check
+        self._send_queue = asyncio.Queue(maxsize=self.SEND_QUEUE_SIZE)
+        workers = [asyncio.create_task(self._sender_worker()) for _ in range(self.SENDER_WORKERS)]
+        
         logger.info("Starting periodic project monitoring loop")
         
-        while self.is_running:
-            # Calculate smart interval and wait first
-            await self._wait_smart_interval()
-            
-            try:
-                await self._check_projects_for_all_users()
-            except Exception as e:
-                logger.error(f"Error in project monitoring loop: {e}", exc_info=True)
+        try:
+            while self.is_running:
+                # Calculate smart interval and wait first
+                await self._wait_smart_interval()
+                if self._stop_event.is_set():
+                    break
+                
+                try:
+                    await self._check_projects_for_all_users()
+                except Exception as e:
+                    logger.error(f"Error in project monitoring loop: {e}", exc_info=True)
+                
+                self._adjust_interval_multiplier()
+        finally:
+            # Workers unmark the item they are delivering when cancelled,
+            # items still queued are unmarked here
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            await self._unmark_undelivered()
+            self.is_running = False
     
     def stop_monitoring(self) -> None:
         """Stop the project monitoring loop."""
         self.is_running = False
+        self._stop_event.set()
         logger.info("Stopping project monitoring service")
     
+    async def stop(self, timeout: float) -> None:
+        """
+        Stop monitoring and wait for the current loop to finish.
+        
+        Waits on the live task, which ensure_monitoring() may have replaced
+        since startup; the loop is cancelled if it does not end within timeout.
+        """
+        self.stop_monitoring()
+        
+        task = self._task
+        if task is None or task.done():
+            return
+        
+        await asyncio.wait({task}, timeout=timeout)
+        if not task.done():
+            logger.warning("Project monitoring did not stop in %ss, cancelling", timeout)
+            task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    
     async def _check_projects_for_all_users(self) -> None:
         """Check for new projects for all active users."""
         # Skip if there are no active users
@@ -63,32 +150,42 @@ class ProjectService:
         logger.info(f"Found {active_users_count} active users to notify about new projects")
         
         if not active_users:
-            logger.info("No active users found, waiting 10s before next check")
-            await asyncio.sleep(10)  # Wait for users to become active
+            # The next interval wait blocks until a user activates
+            logger.info("No active users found, skipping check")
             return
         
-        # Check for each active user with their filters
-        for user_id in active_users.copy():  # Copy to avoid modification during iteration
-            try:
-                await self._check_projects_for_user(user_id)
-            except Exception as e:
-                logger.error(f"Error checking projects for user {user_id}: {e}", exc_info=True)
+        # Group users by filter fingerprint, every group needs a single API fetch
+        buckets: Dict[frozenset, List[int]] = defaultdict(list)
+        # No await inside the loop, so the set cannot change while it is iterated
+        for user_id in active_users:
+            buckets[frozenset(user_manager.get_user_filters(user_id).items())].append(user_id)
+        
+        # Check groups concurrently, so one slow group does not hold back the others
+        user_groups = list(buckets.values())
+        results = await asyncio.gather(
+            *(self._check_projects_for_users(user_ids) for user_ids in user_groups),
+            return_exceptions=True
+        )
+        for user_ids, result in zip(user_groups, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error checking projects for users {user_ids}: {result}", exc_info=result)
         
         # Clean up sent projects if list gets too large
         await user_manager.cleanup_sent_projects()
     
-    async def _check_projects_for_user(self, user_id: int) -> None:
-        """Check and send new projects for a specific user."""
-        user_filters = user_manager.get_user_filters(user_id)
-        logger.info(f"Checking projects for user {user_id} with filters: {user_filters}")
+    async def _check_projects_for_users(self, user_ids: List[int]) -> None:
+        """Check and send new projects for users that share the same filters."""
+        user_filters = user_manager.get_user_filters(user_ids[0])
+        logger.info(f"Checking projects for {len(user_ids)} users with filters: {user_filters}")
+        logger.debug("Users in filter group: %s", user_ids)
         
         # Get projects from API
         projects = await api_client.get_projects(user_filters)
         if not projects:
-            # logger.warning(f"No projects received from API for user {user_id}")
+            # logger.warning(f"No projects received from API for users {user_ids}")
             return
         
-        logger.info(f"Processing {len(projects)} projects for user {user_id}")
+        logger.info(f"Processing {len(projects)} projects for {len(user_ids)} users")
         
         # Тимчасово відключено отримання навичок користувача
         # оскільки фільтр only_my_skills працює тільки з персональним ключем
@@ -97,36 +194,75 @@ class ProjectService:
         #     user_skills = await api_client.get_user_skills()
         #     logger.info(f"User {user_id} skills: {user_skills}")
         
-        # Process projects (newest first)
+        # Sent projects of every user, looked up once per group
+        user_sent = [(user_id, user_manager.user_sent_projects.get(user_id, _NOTHING_SENT)) for user_id in user_ids]
+        
+        # Process projects (newest first), each one for all users of the group at once
         for project in reversed(projects):
-            await self._process_project_for_user(project, user_id, user_filters, user_skills)
+            # Most projects were delivered on earlier ticks, skip those before any filtering
+            project_id = project.get("id")
+            recipients = [user_id for user_id, sent in user_sent if project_id not in sent]
+            if not recipients:
+                continue
+            
+            # Users of the group share filters, so one check decides for all of them.
+            # Recipients are already narrowed to users who have not got the project.
+            if not project_checker.should_process_project(project, user_filters, user_skills):
+                logger.info(f"Project {project_id} not suitable for {len(recipients)} users, skipping")
+                logger.debug("Project %s skipped for users %s", project_id, recipients)
+                continue
+            
+            # Format once, every recipient gets the same text and keyboard
+            # Тимчасово відключено відображення skill_ids оскільки фільтр only_my_skills недоступний
+            show_skill_ids = False  # user_filters.get("only_my_skills") == "1"
+            message_text, keyboard = message_formatter.format_project_message(project, show_skill_ids)
+            
+            results = await asyncio.gather(
+                *(self._process_project_for_user_bounded(project_id, user_id, message_text, keyboard)
+                  for user_id in recipients),
+                return_exceptions=True
+            )
+            for user_id, result in zip(recipients, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Error processing project {project_id} for user {user_id}: {result}", exc_info=result)
     
-    async def _process_project_for_user(self, project: dict, user_id: int, 
-                                      user_filters: dict, user_skills: list) -> None:
-        """Process a single project for a user."""
-        project_id = project.get("id")
-        
-        logger.info(f"Processing project {project_id} for user {user_id}")
-        
-        # Check if project should be processed
-        if not project_checker.should_process_project(
-            project, user_filters, user_skills, user_id, user_manager.user_sent_projects
-        ):
-            logger.info(f"Project {project_id} not suitable for user {user_id}, skipping")
-            return
-        
-        # Mark project as sent to this user
+    async def _process_project_for_user_bounded(self, project_id: int, user_id: int,
+                                                message_text: str, keyboard) -> None:
+        """Mark and queue a project for a user, limited by MAX_CONCURRENT_SENT_MARKS."""
+        async with self._mark_semaphore:
+            await self._process_project_for_user(project_id, user_id, message_text, keyboard)
+    
+    async def _process_project_for_user(self, project_id: int, user_id: int, 
+                                      message_text: str, keyboard) -> None:
+        """Mark a matching project as sent to a user and queue its notification."""
         logger.info(f"Adding project {project_id} to sent projects for user {user_id}")
-        await user_manager.add_sent_project(project_id, user_id)
-        
-        # Format and send message
-        # Тимчасово відключено відображення skill_ids оскільки фільтр only_my_skills недоступний
-        show_skill_ids = False  # user_filters.get("only_my_skills") == "1"
-        message_text, keyboard = message_formatter.format_project_message(project, show_skill_ids)
+        # Only the caller that marks the project queues it, so it is never sent twice
+        if not await user_manager.add_sent_project(project_id, user_id):
+            logger.info(f"Project {project_id} already sent to user {user_id}, skipping")
+            return
         
+        # Hand over to the sender workers, waits if the queue is full
+        try:
+            await self._send_queue.put((user_id, project_id, message_text, keyboard))
+        except asyncio.CancelledError:
+            # Stopped before the item reached the queue, keep it for the next run
+            await user_manager.remove_sent_project(project_id, user_id)
+            raise
+    
+    async def _sender_worker(self) -> None:
+        """Deliver queued notifications one by one."""
+        while True:
+            user_id, project_id, message_text, keyboard = await self._send_queue.get()
+            try:
+                await self._deliver_project(user_id, project_id, message_text, keyboard)
+            finally:
+                self._send_queue.task_done()
+    
+    async def _deliver_project(self, user_id: int, project_id: int, message_text: str, keyboard) -> None:
+        """Send a formatted project notification to a user."""
         try:
             logger.info(f"Sending project {project_id} to user {user_id}")
-            await self.bot.send_message(
+            await self._send_with_retry(
                 user_id, 
                 message_text, 
                 parse_mode='HTML',
@@ -134,14 +270,76 @@ class ProjectService:
                 reply_markup=keyboard
             )
             logger.info(f"Successfully sent project {project_id} to user {user_id}")
+        except asyncio.CancelledError:
+            # Stopped mid-delivery, unmark so the project is sent after restart
+            logger.info(f"Delivery of project {project_id} to user {user_id} interrupted")
+            await user_manager.remove_sent_project(project_id, user_id)
+            raise
+        except _TRANSIENT_SEND_ERRORS as e:
+            # Unmark the project, so the next check delivers it again
+            logger.error(f"Giving up sending project {project_id} to user {user_id}: {e!r}")
+            await user_manager.remove_sent_project(project_id, user_id)
         except Exception as e:
             logger.error(f"Failed to send message to user {user_id}: {e}", exc_info=True)
     
+    async def _unmark_undelivered(self) -> None:
+        """Unmark projects still queued on shutdown, so they are sent after restart."""
+        while not self._send_queue.empty():
+            user_id, project_id, _, _ = self._send_queue.get_nowait()
+            try:
+                await user_manager.remove_sent_project(project_id, user_id)
+            except Exception as e:
+                logger.error(f"Failed to unmark project {project_id} for user {user_id}: {e}")
+    
+    async def _send_with_retry(self, chat_id: int, text: str, **kwargs):
+        """
+        Send a message, retrying flood control and transient network errors.
+        
+        Flood control waits exactly the retry_after given by Telegram, other
+        transient errors back off exponentially (0.5s, 1s, ...). The last
+        error is re-raised once all attempts are used.
+        """
+        for attempt in range(self.SEND_ATTEMPTS):
+            # Wait for a free slot under Telegram flood limits
+            await send_limiter.acquire(chat_id)
+            try:
+                return await self.bot.send_message(chat_id, text, **kwargs)
+            except TelegramRetryAfter as e:
+                self._on_flood_control()
+                if attempt == self.SEND_ATTEMPTS - 1:
+                    raise
+                retry_delay = e.retry_after
+            except (TelegramNetworkError, TelegramServerError, asyncio.TimeoutError) as e:
+                if attempt == self.SEND_ATTEMPTS - 1:
+                    raise
+                retry_delay = self.SEND_RETRY_BASE_DELAY * 2 ** attempt
+            
+            logger.warning(f"Retrying message to {chat_id} in {retry_delay}s (attempt {attempt + 2}/{self.SEND_ATTEMPTS})")
+            await asyncio.sleep(retry_delay)
+    
+    def _on_flood_control(self) -> None:
+        """Slow down the following checks after Telegram flood control."""
+        self._flood_seen = True
+        self._clean_streak = 0
+        self._interval_multiplier = min(
+            self.MAX_INTERVAL_MULTIPLIER, self._interval_multiplier * self.FLOOD_INTERVAL_GROWTH
+        )
+    
+    def _adjust_interval_multiplier(self) -> None:
+        """Decay the interval multiplier back to 1 after enough clean ticks."""
+        if self._flood_seen:
+            self._flood_seen = False
+            return
+        
+        self._clean_streak += 1
+        if self._clean_streak >= self.CLEAN_TICKS_BEFORE_DECAY:
+            self._clean_streak = 0
+            self._interval_multiplier = max(1.0, self._interval_multiplier * self.FLOOD_INTERVAL_DECAY)
+    
     async def _wait_smart_interval(self) -> None:
         """Wait for the calculated smart interval."""
         if not user_manager.active_users:
-            logger.debug("No active users, using short interval")
-            await asyncio.sleep(10)
+            await self._wait_for_active_users()
             return
         
         min_user_interval = user_manager.get_min_user_interval()
@@ -153,9 +351,29 @@ class ProjectService:
             rate_limiter.remaining
         )
         
-        logger.info(f"Waiting {smart_interval}s until next check (min_interval={min_user_interval}s, users={active_users_count}, rate_remaining={rate_limiter.remaining})")
-        await asyncio.sleep(smart_interval)
-
-
-# This will be initialized in main bot file
-project_service = None
\ No newline at end of file
+        # Back off further while Telegram keeps answering with flood control
+        if self._interval_multiplier > 1.0:
+            smart_interval = round(smart_interval * self._interval_multiplier)
+        
+        logger.info(f"Waiting {smart_interval}s until next check (min_interval={min_user_interval}s, users={active_users_count}, rate_remaining={rate_limiter.remaining}, multiplier={self._interval_multiplier:.2f})")
+        await self._sleep_unless_stopped(smart_interval)
+    
+    async def _wait_for_active_users(self) -> None:
+        """Wait until a user activates notifications or monitoring is stopped."""
+        logger.info("No active users, waiting for activation")
+        waiters = [
+            asyncio.create_task(user_manager.has_active_users.wait()),
+            asyncio.create_task(self._stop_event.wait()),
+        ]
+        try:
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+    
+    async def _sleep_unless_stopped(self, delay: float) -> None:
+        """Sleep for the given delay, returning at once when monitoring is stopped."""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
\ No newline at end of file
@@ -0,0 +1,8 @@
+"""
+Shared constants.
+"""
+
+from types import MappingProxyType
+
+# Read-only default for missing nested API objects (project attributes, links, ...)
+EMPTY_MAPPING = MappingProxyType({})
\ No newline at end of file
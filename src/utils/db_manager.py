@@ -6,49 +6,167 @@ Handles database connections and CRUD operations.
 
 import logging
 import datetime
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, Dict, Any, Optional, Set
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import ASCENDING
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure, PyMongoError
 
-import config
+from config import CFG
 
 logger = logging.getLogger(__name__)
 
+# MongoDB server error codes
+DUPLICATE_KEY_ERROR = 11000
+INDEX_OPTIONS_CONFLICT = 85
+
 
 class DatabaseManager:
     """Handles database operations."""
     
+    # Documents per cursor round trip when iterating users
+    USERS_BATCH_SIZE = 200
+    
     def __init__(self):
-        """Initialize database manager."""
-        self.client = None
+        """
+        Initialize database manager.
+        
+        The client is created right away, Motor opens connections lazily
+        on the first operation, so no method has to check for a connection.
+        """
+        # Create client with a bounded connection pool
+        client_options = {
+            "maxPoolSize": CFG.MONGO_MAX_POOL_SIZE,
+            "minPoolSize": CFG.MONGO_MIN_POOL_SIZE,
+            "maxIdleTimeMS": CFG.MONGO_MAX_IDLE_TIME_MS,
+            "waitQueueTimeoutMS": CFG.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            "serverSelectionTimeoutMS": CFG.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        }
+        if CFG.MONGO_COMPRESSORS:
+            client_options["compressors"] = CFG.MONGO_COMPRESSORS
+        
+        self.client: Optional[AsyncIOMotorClient] = None
         self.db: Optional[AsyncIOMotorDatabase] = None
+        self._connected = False
+        # Invalid URI or options, reported by connect() instead of failing the import
+        self._client_error: Optional[Exception] = None
+        try:
+            self.client = AsyncIOMotorClient(CFG.MONGO_URI, **client_options)
+            self.db = self.client[CFG.MONGO_DB_NAME]
+        except (PyMongoError, ValueError, TypeError) as e:
+            self._client_error = e
     
     async def connect(self) -> None:
         """
-        Connect to MongoDB database.
+        Check the MongoDB connection and warm up the pool.
         
-        Creates a connection to MongoDB using the URI from config.
+        Optional, safe to call more than once: only the first successful
+        call talks to the server.
         """
+        if self._connected:
+            return
+        
         try:
-            # Create client
-            self.client = AsyncIOMotorClient(config.MONGO_URI)
+            if self._client_error is not None:
+                raise self._client_error
+            
+            # Round trip once, so the first real query does not pay for
+            # server discovery and the connection handshake
+            await self.db.command("ping")
             
-            # Get database
-            self.db = self.client[config.MONGO_DB_NAME]
+            await self.ensure_indexes()
+            await self.migrate_legacy_sent_projects()
+            self._connected = True
             
-            logger.info(f"Connected to MongoDB: {config.MONGO_DB_NAME}")
+            logger.info(f"Connected to MongoDB: {CFG.MONGO_DB_NAME}")
         except Exception as e:
             logger.error(f"Error connecting to MongoDB: {e}")
             raise
     
+    async def ensure_indexes(self) -> None:
+        """
+        Create indexes used by the bot's queries.
+        
+        Safe to run on every start, MongoDB skips indexes that already exist.
+        """
+        # Every user query matches on user_id
+        try:
+            await self.db.users.create_index("user_id", unique=True)
+        except OperationFailure as e:
+            # Duplicate users from before the upsert, keep running without uniqueness
+            logger.warning(f"Could not create unique user_id index: {e}")
+            await self.db.users.create_index("user_id")
+        # Only active users are looked up by the flag
+        await self.db.users.create_index(
+            "active", partialFilterExpression={"active": True}
+        )
+        # New users count in /status
+        await self.db.users.create_index("created_at")
+        
+        # One record per (user, project), also serves per-user lookups
+        await self.db.sent_projects.create_index(
+            [("user_id", ASCENDING), ("project_id", ASCENDING)], unique=True
+        )
+        # Old records expire on the server, no client-side cleanup needed
+        ttl_seconds = CFG.SENT_PROJECTS_TTL_DAYS * 86400
+        try:
+            await self.db.sent_projects.create_index("timestamp", expireAfterSeconds=ttl_seconds)
+        except OperationFailure as e:
+            if e.code != INDEX_OPTIONS_CONFLICT:
+                raise
+            # SENT_PROJECTS_TTL_DAYS changed, update the existing index in place
+            await self.db.command(
+                "collMod", "sent_projects",
+                index={"keyPattern": {"timestamp": 1}, "expireAfterSeconds": ttl_seconds}
+            )
+            logger.info(f"Sent projects TTL changed to {CFG.SENT_PROJECTS_TTL_DAYS} days")
+    
+    async def migrate_legacy_sent_projects(self) -> None:
+        """Move sent_projects arrays from user documents into the sent_projects collection."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        cursor = self.db.users.find(
+            {"sent_projects.0": {"$exists": True}},
+            {"user_id": 1, "sent_projects": 1}
+        )
+        
+        migrated_user_ids = []
+        async for user in cursor:
+            user_id = user["user_id"]
+            records = [
+                {"user_id": user_id, "project_id": project_id, "timestamp": now}
+                for project_id in user["sent_projects"]
+            ]
+            try:
+                await self.db.sent_projects.insert_many(records, ordered=False)
+            except BulkWriteError as e:
+                # Duplicates are left from an interrupted migration, anything else
+                # means records were not copied and the array has to stay
+                write_errors = e.details.get("writeErrors", [])
+                if any(error.get("code") != DUPLICATE_KEY_ERROR for error in write_errors):
+                    logger.error(f"Failed to migrate sent projects for user {user_id}: {e}")
+                    continue
+            
+            migrated_user_ids.append(user_id)
+            logger.info(f"Migrated {len(records)} sent projects for user {user_id}")
+        
+        # Drop the arrays that were copied, empty ones have nothing to copy
+        await self.db.users.update_many(
+            {"$or": [
+                {"user_id": {"$in": migrated_user_ids}},
+                {"sent_projects": {"$size": 0}},
+            ]},
+            {"$unset": {"sent_projects": ""}}
+        )
+    
     async def close(self) -> None:
         """
         Close MongoDB connection.
         """
-        if self.client is not None:
-            self.client.close()
-            self.client = None
-            self.db = None
-            logger.info("MongoDB connection closed")
+        if self.client is None:
+            return
+        
+        self.client.close()
+        self._connected = False
+        logger.info("MongoDB connection closed")
     
     async def add_user(self, user_data: Dict[str, Any]) -> str:
         """
@@ -60,9 +178,6 @@ class DatabaseManager:
         Returns:
             User ID
         """
-        if self.db is None:
-            await self.connect()
-        
         collection = self.db.users
         user_id = user_data.get('user_id')
         
@@ -70,27 +185,21 @@ class DatabaseManager:
             logger.error("User data is missing user_id")
             return ""
             
-        # Check if user exists
-        existing_user = await collection.find_one({"user_id": user_id})
-        
-        if existing_user:
-            # Сохраняем список отправленных проектов, если он существует
-            if 'sent_projects' in existing_user and 'sent_projects' not in user_data:
-                user_data['sent_projects'] = existing_user['sent_projects']
-                
-            # Update existing user - don't modify created_at
-            await collection.update_one(
-                {"user_id": user_id},
-                {"$set": user_data}
-            )
-            logger.info(f"Updated user {user_id} in database")
-        else:
-            # Insert new user with created_at timestamp and empty sent_projects array
-            user_data["created_at"] = datetime.datetime.now()
-            if 'sent_projects' not in user_data:
-                user_data['sent_projects'] = []
-            await collection.insert_one(user_data)
+        # Update existing user or insert a new one in a single round trip,
+        # created_at is only written on insert
+        result = await collection.update_one(
+            {"user_id": user_id},
+            {
+                "$set": user_data,
+                "$setOnInsert": {"created_at": datetime.datetime.now()}
+            },
+            upsert=True
+        )
+        
+        if result.upserted_id is not None:
             logger.info(f"Added user {user_id} to database with creation timestamp")
+        else:
+            logger.info(f"Updated user {user_id} in database")
         
         return str(user_id)
     
@@ -104,9 +213,6 @@ class DatabaseManager:
         Returns:
             User document or None if not found
         """
-        if self.db is None:
-            await self.connect()
-        
         collection = self.db.users
         user = await collection.find_one({"user_id": user_id})
         
@@ -123,9 +229,6 @@ class DatabaseManager:
         Returns:
             True if user was updated, False otherwise
         """
-        if self.db is None:
-            await self.connect()
-        
         collection = self.db.users
         # Add last_updated field
         update_data["last_updated"] = datetime.datetime.now()
@@ -151,9 +254,6 @@ class DatabaseManager:
         Returns:
             True if user was deleted, False otherwise
         """
-        if self.db is None:
-            await self.connect()
-        
         collection = self.db.users
         result = await collection.delete_one({"user_id": user_id})
         
@@ -164,65 +264,88 @@ class DatabaseManager:
         logger.warning(f"User {user_id} not found for deletion")
         return False
     
-    async def get_all_active_users(self) -> List[Dict[str, Any]]:
+    async def get_all_active_users(self) -> AsyncIterator[Dict[str, Any]]:
         """
-        Get all active users from database.
+        Iterate over all active users in database.
         
-        Returns:
-            List of user documents with active=True
-        """
-        if self.db is None:
-            await self.connect()
+        Documents are yielded as the cursor fetches them, nothing is buffered.
         
+        Yields:
+            User documents with active=True
+        """
         collection = self.db.users
-        cursor = collection.find({"active": True})
+        cursor = collection.find({"active": True}).batch_size(self.USERS_BATCH_SIZE)
         
-        users = []
         async for user in cursor:
-            users.append(user)
-        
-        return users
+            yield user
     
-    async def get_all_users(self) -> List[Dict[str, Any]]:
+    async def get_all_users(self) -> AsyncIterator[Dict[str, Any]]:
         """
-        Get all users from database.
+        Iterate over all users in database.
         
-        Returns:
-            List of all user documents
-        """
-        if self.db is None:
-            await self.connect()
+        Documents are yielded as the cursor fetches them, nothing is buffered.
         
+        Yields:
+            User documents
+        """
         collection = self.db.users
-        cursor = collection.find()
+        cursor = collection.find().batch_size(self.USERS_BATCH_SIZE)
         
-        users = []
         async for user in cursor:
-            users.append(user)
+            yield user
+    
+    async def get_sent_projects(self) -> Dict[int, Set[int]]:
+        """
+        Get IDs of sent projects for all users.
         
-        return users
+        Returns:
+            Dictionary of sent project IDs by user ID
+        """
+        collection = self.db.sent_projects
+        cursor = collection.find({}, {"_id": 0, "user_id": 1, "project_id": 1})
+        
+        sent_projects: Dict[int, Set[int]] = {}
+        async for record in cursor:
+            sent_projects.setdefault(record["user_id"], set()).add(record["project_id"])
+        
+        return sent_projects
     
     async def add_sent_project(self, project_id: int, user_id: int) -> None:
         """
-        Add project to user's sent_projects list.
+        Record project as sent to user.
         
         Args:
             project_id: Freelancehunt project ID
             user_id: Telegram user ID who received the project
         """
-        if self.db is None:
-            await self.connect()
+        collection = self.db.sent_projects
         
-        collection = self.db.users
-        
-        # Добавляем проект в массив sent_projects, если такого проекта еще нет
-        await collection.update_one(
-            {"user_id": user_id},
-            {"$addToSet": {"sent_projects": project_id}}
-        )
+        try:
+            await collection.insert_one({
+                "user_id": user_id,
+                "project_id": project_id,
+                "timestamp": datetime.datetime.now(datetime.timezone.utc)
+            })
+        except DuplicateKeyError:
+            # Already recorded, the unique index keeps a single record
+            return
         
         logger.info(f"Project {project_id} added to sent projects for user {user_id}")
     
+    async def remove_sent_project(self, project_id: int, user_id: int) -> None:
+        """
+        Remove sent project record for user.
+        
+        Args:
+            project_id: Freelancehunt project ID
+            user_id: Telegram user ID
+        """
+        collection = self.db.sent_projects
+        
+        await collection.delete_one({"user_id": user_id, "project_id": project_id})
+        
+        logger.info(f"Project {project_id} removed from sent projects for user {user_id}")
+    
     async def is_project_sent(self, project_id: int, user_id: int) -> bool:
         """
         Check if project was already sent to specific user.
@@ -234,51 +357,40 @@ class DatabaseManager:
         Returns:
             True if project was sent to user, False otherwise
         """
-        if self.db is None:
-            await self.connect()
-        
-        collection = self.db.users
-        result = await collection.find_one({
-            "user_id": user_id,
-            "sent_projects": project_id
-        })
+        collection = self.db.sent_projects
+        count = await collection.count_documents(
+            {"user_id": user_id, "project_id": project_id}, limit=1
+        )
         
-        return result is not None
+        return count > 0
     
-    async def cleanup_user_sent_projects(self, user_id: int, keep_count: int = 500) -> None:
+    async def get_service_state(self, name: str) -> Optional[Dict[str, Any]]:
         """
-        Clean up old sent projects for a user, keeping only the newest ones.
+        Get persisted state of an external service.
         
         Args:
-            user_id: Telegram user ID
-            keep_count: Number of most recent projects to keep
+            name: Service name
+            
+        Returns:
+            State document or None if not found
         """
-        if self.db is None:
-            await self.connect()
-        
-        collection = self.db.users
+        collection = self.db.service_state
+        return await collection.find_one({"name": name})
+    
+    async def set_service_state(self, name: str, state: Dict[str, Any]) -> None:
+        """
+        Persist state of an external service.
         
-        # Get user document
-        user = await collection.find_one({"user_id": user_id})
-        if not user or "sent_projects" not in user:
-            return
-            
-        sent_projects = user.get("sent_projects", [])
-        
-        # If there are too many projects, keep only the newest ones
-        # (assuming newer projects have higher IDs)
-        if len(sent_projects) > keep_count:
-            # Sort by ID in descending order and keep the most recent ones
-            sent_projects.sort(reverse=True)
-            new_sent_projects = sent_projects[:keep_count]
-            
-            # Update the user document
-            await collection.update_one(
-                {"user_id": user_id},
-                {"$set": {"sent_projects": new_sent_projects}}
-            )
-            
-            logger.info(f"Cleaned up sent projects for user {user_id}, kept {keep_count} most recent")
+        Args:
+            name: Service name
+            state: Fields to store
+        """
+        collection = self.db.service_state
+        await collection.update_one(
+            {"name": name},
+            {"$set": state},
+            upsert=True
+        )
 
 
 # Global database manager instance
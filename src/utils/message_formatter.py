@@ -9,6 +9,8 @@ import logging
 from typing import Dict, Any, Tuple
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
+from src.utils.constants import EMPTY_MAPPING
+
 logger = logging.getLogger(__name__)
 
 
@@ -77,7 +79,7 @@ class MessageFormatter:
     def get_project_url(project: Dict[str, Any]) -> str:
         """Extract project URL from project data."""
         project_id = project.get("id")
-        links = project.get("links", {})
+        links = project.get("links") or EMPTY_MAPPING
         
         # Extract URL based on the actual API structure
         if isinstance(links, dict) and "self" in links:
@@ -94,7 +96,7 @@ class MessageFormatter:
     @staticmethod
     def format_project_message(project: Dict[str, Any], show_skill_ids: bool = False) -> Tuple[str, InlineKeyboardMarkup]:
         """Format project data into a Telegram message with inline keyboard."""
-        attributes = project.get("attributes", {})
+        attributes = project.get("attributes") or EMPTY_MAPPING
         
         # Basic project info
         title = attributes.get("name", "Назва відсутня")
@@ -103,7 +105,7 @@ class MessageFormatter:
         )
         
         # Budget
-        budget = attributes.get("budget", {})
+        budget = attributes.get("budget") or EMPTY_MAPPING
         budget_text = MessageFormatter.format_budget(budget)
         
         # Skills
@@ -111,7 +113,7 @@ class MessageFormatter:
         skills_text = MessageFormatter.format_skills(skills)
         
         # Employer
-        employer = attributes.get("employer", {})
+        employer = attributes.get("employer") or EMPTY_MAPPING
         employer_name = MessageFormatter.format_employer_name(employer)
         
         # Project URL
@@ -5,9 +5,9 @@ Handles project filtering and processing logic.
 """
 
 import logging
-from typing import Dict, Any, List, Set, Dict
+from typing import Dict, Any, List
 
-import config
+from src.utils.constants import EMPTY_MAPPING
 
 logger = logging.getLogger(__name__)
 
@@ -17,9 +17,7 @@ class ProjectChecker:
     
     def should_process_project(self, project: Dict[str, Any], 
                              filters: Dict[str, str], 
-                             user_skills: List[int],
-                             user_id: int,
-                             user_sent_projects: Dict[int, Set[int]]) -> bool:
+                             user_skills: List[int]) -> bool:
         """
         Check if project should be processed and sent to user.
         
@@ -27,8 +25,6 @@ class ProjectChecker:
             project: Project data from API
             filters: User filter settings
             user_skills: User skills IDs list
-            user_id: Telegram user ID
-            user_sent_projects: Dictionary of sent projects by user ID
             
         Returns:
             True if project should be processed, False otherwise
@@ -40,16 +36,11 @@ class ProjectChecker:
             logger.warning("Project has no ID, skipping")
             return False
         
-        # Check if project was already sent to this user
-        if user_id in user_sent_projects and project_id in user_sent_projects.get(user_id, set()):
-            logger.info(f"Project {project_id} already sent to user {user_id}, skipping")
-            return False
-        
         # Get project attributes
-        attributes = project.get("attributes", {})
+        attributes = project.get("attributes") or EMPTY_MAPPING
         
         # Get project status
-        status = attributes.get("status", {})
+        status = attributes.get("status") or EMPTY_MAPPING
         status_id = status.get("id")
         status_name = status.get("name", "")
         
@@ -60,7 +51,7 @@ class ProjectChecker:
         
         # Check employer ID filter
         if filters.get("employer_id"):
-            employer_id = attributes.get("employer", {}).get("id")
+            employer_id = (attributes.get("employer") or EMPTY_MAPPING).get("id")
             filter_employer_id = filters["employer_id"]
             
             if str(employer_id) != str(filter_employer_id):
@@ -93,7 +84,7 @@ class ProjectChecker:
         #         return False
         
         # Project passes all checks
-        logger.info(f"Project {project_id} passed all filters, will be sent to user {user_id}")
+        logger.info(f"Project {project_id} passed all filters")
         return True
     
     def calculate_smart_interval(self, min_user_interval: int, 
@@ -0,0 +1,80 @@
+"""
+Outgoing message limiter for Telegram.
+
+Keeps bot notifications under Telegram flood limits to avoid HTTP 429 errors.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from config import CFG
+
+logger = logging.getLogger(__name__)
+
+
+class SendLimiter:
+    """
+    Spaces out bot messages to respect Telegram flood limits.
+    
+    Telegram allows about 30 messages per second in total and about
+    1 message per second to the same chat. Every caller waits for its chat
+    first and then reserves a global slot, so a burst of notifications
+    is spread evenly instead of hitting the API at once.
+    """
+    
+    # Stale per-chat entries are dropped once the table grows past this size
+    MAX_TRACKED_CHATS = 10000
+    
+    def __init__(self):
+        self.min_interval_between_messages = 1.0 / CFG.TELEGRAM_GLOBAL_RATE_LIMIT
+        self.per_chat_interval = CFG.TELEGRAM_PER_CHAT_INTERVAL
+        # Earliest event loop time the next message may go out
+        self._next_allowed_time = 0.0
+        # Earliest event loop time the next message to each chat may go out
+        self._next_chat_time: dict[int, float] = {}
+        # Messages to the same chat queue up one after another
+        self._chat_locks: dict[int, asyncio.Lock] = {}
+    
+    async def acquire(self, chat_id: int) -> None:
+        """
+        Wait until a message to the chat may be sent.
+        
+        Global slots are reserved before sleeping and there is no await between
+        the read and the write, so concurrent callers need no shared lock.
+        """
+        loop = asyncio.get_running_loop()
+        lock = self._chat_locks.setdefault(chat_id, asyncio.Lock())
+        
+        async with lock:
+            now = loop.time()
+            
+            # Wait out the per-chat interval, only this chat is held back
+            chat_wait = self._next_chat_time.get(chat_id, 0.0) - now
+            if chat_wait > 0:
+                await asyncio.sleep(chat_wait)
+                now = loop.time()
+            
+            # Then take the next global slot shared by all chats
+            slot = max(now, self._next_allowed_time)
+            self._next_allowed_time = slot + self.min_interval_between_messages
+            if slot > now:
+                await asyncio.sleep(slot - now)
+            
+            self._next_chat_time[chat_id] = slot + self.per_chat_interval
+        
+        if len(self._chat_locks) > self.MAX_TRACKED_CHATS:
+            self._prune(loop.time())
+    
+    def _prune(self, now: float) -> None:
+        """Forget idle chats whose next slot is already in the past."""
+        for chat_id, lock in list(self._chat_locks.items()):
+            if not lock.locked() and self._next_chat_time.get(chat_id, 0.0) <= now:
+                del self._chat_locks[chat_id]
+                self._next_chat_time.pop(chat_id, None)
+        logger.debug("Send limiter tracks %s chats after pruning", len(self._chat_locks))
+
+
+# Global Telegram send limiter instance
+send_limiter = SendLimiter()
\ No newline at end of file
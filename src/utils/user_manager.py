@@ -9,7 +9,8 @@ import logging
 from typing import Dict, Set, List, Any, Optional
 import asyncio
 
-import config
+from config import CFG
+from src.api.freelancehunt import FILTER_KEYS
 from src.utils.db_manager import db_manager
 
 logger = logging.getLogger(__name__)
@@ -21,9 +22,17 @@ class UserManager:
     def __init__(self):
         """Initialize user manager."""
         self.active_users: Set[int] = set()
+        # Set while at least one user is active, lets monitoring idle without polling
+        self.has_active_users = asyncio.Event()
         self.user_filters: Dict[int, Dict[str, str]] = {}
         self.user_intervals: Dict[int, int] = {}
         self.user_sent_projects: Dict[int, Set[int]] = {}
+        # Running total of sent projects across all users
+        self._total_sent = 0
+        # Serialize filter updates, they are rare enough to share one lock
+        self._filter_lock = asyncio.Lock()
+        # Rendered filter descriptions, dropped whenever the user's filters change
+        self._filter_descriptions: Dict[int, str] = {}
         self._loaded = False
         
     async def load_data_from_db(self) -> None:
@@ -32,14 +41,10 @@ class UserManager:
             return
             
         try:
-            # Ensure connection to database
-            if db_manager.db is None:
-                await db_manager.connect()
+            # Load sent projects, then stream all users
+            sent_projects = await db_manager.get_sent_projects()
             
-            # Load all users
-            users = await db_manager.get_all_users()
-            
-            for user in users:
+            async for user in db_manager.get_all_users():
                 user_id = user.get('user_id')
                 
                 # Check if user is active
@@ -55,14 +60,13 @@ class UserManager:
                     self.user_intervals[user_id] = user['interval']
                 
                 # Get sent projects
-                if 'sent_projects' in user:
-                    self.user_sent_projects[user_id] = set(user['sent_projects'])
-                else:
-                    self.user_sent_projects[user_id] = set()
+                self.user_sent_projects[user_id] = sent_projects.get(user_id, set())
             
             # Подсчет общего количества отправленных проектов
-            total_sent_projects = sum(len(projects) for projects in self.user_sent_projects.values())
-            logger.info(f"Loaded {len(self.active_users)} active users, {total_sent_projects} sent projects")
+            self._total_sent = sum(len(projects) for projects in self.user_sent_projects.values())
+            if self.active_users:
+                self.has_active_users.set()
+            logger.info(f"Loaded {len(self.active_users)} active users, {self._total_sent} sent projects")
             self._loaded = True
             
         except Exception as e:
@@ -71,10 +75,6 @@ class UserManager:
     async def save_user_to_db(self, user_id: int, user_data: Dict[str, Any]) -> None:
         """Save user data to database."""
         try:
-            # Если у нас есть отправленные проекты в памяти, добавим их в данные пользователя
-            if user_id in self.user_sent_projects and 'sent_projects' not in user_data:
-                user_data['sent_projects'] = list(self.user_sent_projects[user_id])
-                
             await db_manager.add_user(user_data)
             
         except Exception as e:
@@ -93,10 +93,11 @@ class UserManager:
             await self.load_data_from_db()
             
         self.active_users.add(user_id)
+        self.has_active_users.set()
         
         # Set default interval if not set
         if user_id not in self.user_intervals:
-            self.user_intervals[user_id] = config.DEFAULT_CHECK_INTERVAL
+            self.user_intervals[user_id] = CFG.DEFAULT_CHECK_INTERVAL
         
         # Set empty filter if not set
         if user_id not in self.user_filters:
@@ -110,9 +111,8 @@ class UserManager:
         user_data = {
             'user_id': user_id,
             'active': True,
-            'interval': self.user_intervals.get(user_id, config.DEFAULT_CHECK_INTERVAL),
+            'interval': self.user_intervals.get(user_id, CFG.DEFAULT_CHECK_INTERVAL),
             'filters': self.user_filters.get(user_id, {}),
-            'sent_projects': list(self.user_sent_projects.get(user_id, set()))
         }
         
         # Add additional user information if provided
@@ -132,6 +132,8 @@ class UserManager:
             
         if user_id in self.active_users:
             self.active_users.remove(user_id)
+            if not self.active_users:
+                self.has_active_users.clear()
             
             # Update in database
             await db_manager.update_user(user_id, {'active': False})
@@ -151,10 +153,10 @@ class UserManager:
             await self.load_data_from_db()
             
         # Validate interval
-        if interval < config.MIN_CHECK_INTERVAL:
-            interval = config.MIN_CHECK_INTERVAL
-        elif interval > config.MAX_CHECK_INTERVAL:
-            interval = config.MAX_CHECK_INTERVAL
+        if interval < CFG.MIN_CHECK_INTERVAL:
+            interval = CFG.MIN_CHECK_INTERVAL
+        elif interval > CFG.MAX_CHECK_INTERVAL:
+            interval = CFG.MAX_CHECK_INTERVAL
         
         self.user_intervals[user_id] = interval
         
@@ -165,20 +167,32 @@ class UserManager:
     
     def get_user_interval(self, user_id: int) -> int:
         """Get check interval for user."""
-        return self.user_intervals.get(user_id, config.DEFAULT_CHECK_INTERVAL)
+        return self.user_intervals.get(user_id, CFG.DEFAULT_CHECK_INTERVAL)
     
-    async def set_user_filters(self, user_id: int, filters: Dict[str, str]) -> None:
-        """Set filters for user."""
+    async def update_user_filter(self, user_id: int, key: str, value: str) -> None:
+        """
+        Set a single filter for user, persisting only that field.
+        
+        Raises:
+            ValueError: If key is not a known filter name
+        """
+        if key not in FILTER_KEYS:
+            raise ValueError(f"Unknown filter key: {key!r}")
+        
         # Ensure data is loaded
         if not self._loaded:
             await self.load_data_from_db()
-            
-        self.user_filters[user_id] = filters.copy()
         
-        # Update in database
-        await db_manager.update_user(user_id, {'filters': filters})
+        async with self._filter_lock:
+            filters = dict(self.user_filters.get(user_id, {}))
+            filters[key] = value
+            self.user_filters[user_id] = filters
+            self._filter_descriptions.pop(user_id, None)
+            
+            # Update in database
+            await db_manager.update_user(user_id, {f'filters.{key}': value})
         
-        logger.info(f"User {user_id} filters updated: {filters}")
+        logger.info(f"User {user_id} filter {key} set to {value}")
     
     def get_user_filters(self, user_id: int) -> Dict[str, str]:
         """Get filters for user."""
@@ -190,20 +204,28 @@ class UserManager:
         if not self._loaded:
             await self.load_data_from_db()
             
-        self.user_filters[user_id] = {}
-        
-        # Update in database
-        await db_manager.update_user(user_id, {'filters': {}})
+        async with self._filter_lock:
+            self.user_filters[user_id] = {}
+            self._filter_descriptions.pop(user_id, None)
+            
+            # Update in database
+            await db_manager.update_user(user_id, {'filters': {}})
         
         logger.info(f"User {user_id} filters cleared")
     
-    async def add_sent_project(self, project_id: int, user_id: int) -> None:
+    async def add_sent_project(self, project_id: int, user_id: int) -> bool:
         """
         Mark project as sent to specific user.
         
+        The in-memory check and mark happen without an await in between,
+        so concurrent callers cannot both mark the same project.
+        
         Args:
             project_id: Freelancehunt project ID
             user_id: Telegram user ID
+        
+        Returns:
+            True if the project was marked now, False if it was already sent
         """
         # Ensure data is loaded
         if not self._loaded:
@@ -213,12 +235,42 @@ class UserManager:
         if user_id not in self.user_sent_projects:
             self.user_sent_projects[user_id] = set()
             
-        self.user_sent_projects[user_id].add(project_id)
+        sent_projects = self.user_sent_projects[user_id]
+        if project_id in sent_projects:
+            return False
         
-        # Update in database
-        await db_manager.add_sent_project(project_id, user_id)
+        sent_projects.add(project_id)
+        self._total_sent += 1
+        
+        # Update in database, rolling back the mark if it fails (or is cancelled)
+        # so the project is retried on the next check instead of being lost
+        try:
+            await db_manager.add_sent_project(project_id, user_id)
+        except BaseException:
+            sent_projects.discard(project_id)
+            self._total_sent -= 1
+            raise
         
         logger.info(f"Project {project_id} marked as sent to user {user_id}")
+        return True
+    
+    async def remove_sent_project(self, project_id: int, user_id: int) -> None:
+        """
+        Unmark project as sent, e.g. when its delivery failed.
+        
+        Args:
+            project_id: Freelancehunt project ID
+            user_id: Telegram user ID
+        """
+        sent_projects = self.user_sent_projects.get(user_id)
+        if sent_projects is not None and project_id in sent_projects:
+            sent_projects.discard(project_id)
+            self._total_sent -= 1
+        
+        # Update in database
+        await db_manager.remove_sent_project(project_id, user_id)
+        
+        logger.info(f"Project {project_id} unmarked as sent to user {user_id}")
     
     def is_project_sent(self, project_id: int, user_id: int) -> bool:
         """
@@ -252,22 +304,33 @@ class UserManager:
                 
                 # Обновляем множество отправленных проектов
                 self.user_sent_projects[user_id] = set(sent_projects_list[:keep_size])
+                self._total_sent -= len(projects) - len(self.user_sent_projects[user_id])
                 
-                # Обновляем в базе данных
-                await db_manager.cleanup_user_sent_projects(user_id, keep_size)
-                
+                # Записи в базе данных удаляются TTL индексом
                 logger.info(f"Cleaned up sent projects for user {user_id}, kept {keep_size} latest")
     
+    @property
+    def total_sent_projects(self) -> int:
+        """Total number of sent projects across all users."""
+        return self._total_sent
+    
     def get_min_user_interval(self) -> int:
         """Get minimum interval among all active users."""
         if not self.active_users:
-            return config.DEFAULT_CHECK_INTERVAL
+            return CFG.DEFAULT_CHECK_INTERVAL
         
-        return min([self.user_intervals.get(user_id, config.DEFAULT_CHECK_INTERVAL) 
+        return min([self.user_intervals.get(user_id, CFG.DEFAULT_CHECK_INTERVAL) 
                    for user_id in self.active_users])
     
     def get_filter_description(self, user_id: int) -> str:
         """Get a human-readable description of the user's filters."""
+        description = self._filter_descriptions.get(user_id)
+        if description is None:
+            description = self._filter_descriptions[user_id] = self._build_filter_description(user_id)
+        return description
+    
+    def _build_filter_description(self, user_id: int) -> str:
+        """Render the description of the user's filters."""
         filters = self.get_user_filters(user_id)
         
         if not filters:
@@ -294,26 +357,22 @@ class UserManager:
         if not self._loaded:
             await self.load_data_from_db()
         
-        # Подсчет общего количества отправленных проектов
-        total_sent_projects = sum(len(projects) for projects in self.user_sent_projects.values())
-        
         # Get basic stats
         stats = {
             "active_users": len(self.active_users),
             "total_users": len(self.user_intervals),
-            "sent_projects": total_sent_projects
+            "sent_projects": self._total_sent
         }
         
         # Try to get additional stats from database
         try:
-            if db_manager.db is not None:
-                # Get count of new users in the last 24 hours
-                import datetime
-                yesterday = datetime.datetime.now() - datetime.timedelta(days=1)
-                new_users_count = await db_manager.db.users.count_documents({
-                    "created_at": {"$gte": yesterday}
-                })
-                stats["new_users_24h"] = new_users_count
+            # Get count of new users in the last 24 hours
+            import datetime
+            yesterday = datetime.datetime.now() - datetime.timedelta(days=1)
+            new_users_count = await db_manager.db.users.count_documents({
+                "created_at": {"$gte": yesterday}
+            })
+            stats["new_users_24h"] = new_users_count
         except Exception as e:
             logger.error(f"Error getting additional stats: {e}")
         
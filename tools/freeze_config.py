@@ -0,0 +1,40 @@
+"""
+Configuration freezer.
+
+Reads settings from the environment and .env file, validates them and writes
+config_frozen.py with literal values, so config.py can skip env parsing at
+runtime. Run at deploy time from the project root:
+
+    python tools/freeze_config.py
+"""
+
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTPUT_PATH = os.path.join(ROOT_DIR, "config_frozen.py")
+
+sys.path.insert(0, ROOT_DIR)
+
+# Never read a previous frozen file, it may be stale and break the import
+sys.modules["config_frozen"] = None
+
+import config  # noqa: E402
+
+
+def main():
+    """Writes validated settings into config_frozen.py"""
+    # Always build from the environment, never from a previous frozen file
+    cfg = config._load_config()
+    config.validate_config(cfg)
+    
+    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
+        f.write("# Generated by tools/freeze_config.py - do not edit\n")
+        f.write("from config import Config\n\n")
+        f.write(f"CFG = {cfg!r}\n")
+    
+    print(f"Configuration frozen to {OUTPUT_PATH}")
+
+
+if __name__ == "__main__":
+    main()